@@ -1,25 +1,42 @@
 # Standard Library Imports
 import os
-import json
-from io import StringIO, BytesIO
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
-from typing import Callable, List, Optional, Sequence
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 import warnings
-from typing import Union, Iterator, Any
+from typing import TYPE_CHECKING, Union, Iterable, Iterator, Any
 import subprocess
 import atexit
+import time
+import threading
+import queue
+import hashlib
+import re
+import tempfile
+from collections import OrderedDict, deque
+from itertools import islice
 
 # Third Party Imports
 import fsspec
+import orjson
 import requests
-import pandas as pd
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from lxml import etree, html as lxml_html
 from pystac_client import Client, CollectionClient
 from pystac import Collection, Item, ItemCollection
 import numpy as np
-import rasterio
 from yaspin import yaspin
-import psutil
+
+# aiohttp, pandas and rasterio are slow to import, so they are only loaded where used
+if TYPE_CHECKING:
+    import aiohttp
+    import pandas as pd
+    from rasterio.io import MemoryFile
+    from rasterio.windows import Window
 
 
 # Global Variables
@@ -29,55 +46,515 @@ REMOTE_GATEWAYS = [
     "https://cloudflare-ipfs.com",
     "https://dweb.link",
 ]
+# Maximum number of simultaneous gateway requests issued by the async fetchers
+MAX_CONCURRENT_FETCHES = 8
+# Size of each read when streaming content from IPFS
+CHUNK_SIZE = 4 * 1024 * 1024
+# Minimum progress between two spinner text updates
+SPINNER_UPDATE_BYTES = 4 * 1024 * 1024
+# Maximum number of bytes kept in the in-memory content cache
+CID_CACHE_SIZE_LIMIT = 512 * 1024**2
+
+# CIDs are immutable, so fetched content can be cached without invalidation
+_cid_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_cid_cache_bytes = 0
+_cid_cache_lock = threading.Lock()
+# Compiled once; extracts every link target from a gateway directory listing
+_ANCHOR_HREFS = etree.XPath("//a/@href")
+# Delays (seconds) between RPC API probes while waiting for a freshly started daemon
+DAEMON_STARTUP_BACKOFF = (0.1, 0.2, 0.4, 0.8, 1.6, 3.2)
+# Default upper bound on the size of the on-disk CID cache
+DISK_CACHE_SIZE_LIMIT = 10 * 1024**3
+# File names of disk cache entries: the SHA-256 hex digest of the CID
+_DISK_CACHE_KEY = re.compile(r"[0-9a-f]{64}")
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """
+    Writes data to a temporary file next to `path` and renames it into place, so readers
+    never see a partially written file
+
+    :param path Path: Destination file
+    :param bytes data: Content to write
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
 
 
-def ensure_data_fetched(func) -> Callable[..., Any]:
-    def wrapper(self, *args, **kwargs) -> Any:
-        if self.data is None:
-            print("Data for asset has not been fetched yet. Fetching now...")
-            self.fetch()
-        return func(self, *args, **kwargs)
+class _DiskCache:
+    """Directory of fetched CID contents that persists across processes"""
 
-    return wrapper
+    def __init__(
+        self, directory: Union[str, Path], size_limit: int = DISK_CACHE_SIZE_LIMIT
+    ) -> None:
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.size_limit = size_limit
 
+    def _path(self, cid: str) -> Path:
+        # CIDs may carry a sub-path, so hash them into a flat file name
+        return Path(self.directory, hashlib.sha256(cid.encode()).hexdigest())
+
+    def get(self, cid: str) -> Optional[bytes]:
+        path = self._path(cid)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        # Refresh the modification time so eviction is least-recently-used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted or cleared by another thread since the read
+            pass
+        return data
+
+    def set(self, cid: str, data: bytes) -> None:
+        # The disk cache is an optimisation, so a full or read-only disk must not fail the fetch
+        try:
+            _write_atomic(self._path(cid), data)
+            self._evict()
+        except OSError as exc:
+            warnings.warn(f"Could not write {cid} to the disk cache: {exc}")
 
-def fetchCID(cid: str) -> bytes:
+    def clear(self) -> None:
+        for path in self._entries():
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as exc:
+                warnings.warn(f"Could not remove {path} from the disk cache: {exc}")
+
+    def _entries(self) -> List[Path]:
+        # Only files named like a cache key belong to the cache; cache_dir may be shared
+        return [
+            path
+            for path in self.directory.iterdir()
+            if _DISK_CACHE_KEY.fullmatch(path.name) and path.is_file()
+        ]
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.size_limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def _new_session() -> requests.Session:
+    """
+    Creates a session with pooled keep-alive connections, retrying transient gateway errors
+
+    Refused connections are not retried, so probing a node that isn't running fails fast.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=3, connect=0, backoff_factor=0.2, status_forcelist=[502, 503, 504]
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Session used by assets created without one, so they still share pooled connections
+_DEFAULT_SESSION = _new_session()
+
+
+def _read_with_progress(
+    chunks: Iterable[bytes],
+    name: str,
+    total_size: int,
+) -> bytes:
+    """
+    Collects streamed chunks while reporting progress on a spinner
+
+    Chunks are written into a buffer preallocated from `total_size`. The result is
+    copied once into immutable `bytes`, since it is cached and shared between callers.
+    A stream that ends before `total_size` bytes raises EOFError rather than returning
+    truncated content.
+
+    :param chunks: Iterable of content chunks
+    :param str name: Name shown on the spinner
+    :param int total_size: Expected size in bytes, 0 if unknown
+    """
+    progress = 0
+    reported = 0
+    total_mb = total_size / 1048576
+    with yaspin(
+        text=f"Fetching {name} - 0.00/{total_mb:.2f} MB", color=None
+    ) as spinner:
+        file_data = bytearray(total_size)
+        view = memoryview(file_data)
+
+        for chunk in chunks:
+            end = progress + len(chunk)
+            if end > len(file_data):
+                # Size was unknown or understated, append past the preallocated part
+                view.release()
+                del file_data[progress:]
+                file_data += chunk
+                view = memoryview(file_data)
+            else:
+                view[progress:end] = chunk
+            progress = end
+            if progress - reported >= SPINNER_UPDATE_BYTES:
+                spinner.text = (
+                    f"Fetching {name} - {progress / 1048576:.2f}/{total_mb:.2f} MB"
+                )
+                reported = progress
+
+        view.release()
+        del file_data[progress:]
+        spinner.text = f"Fetching {name} - {progress / 1048576:.2f}/{total_mb:.2f} MB"
+
+        if progress < total_size:
+            spinner.fail("💥 ")
+            raise EOFError(
+                f"Stream for {name} ended after {progress} of {total_size} bytes"
+            )
+        if file_data:
+            spinner.ok("✅ ")
+        else:
+            spinner.fail("💥 ")
+
+    return bytes(file_data)
+
+
+def _catCID(
+    cid: str,
+    session: requests.Session,
+    local_gateway: str,
+    api_port: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> bytes:
+    """
+    Streams data for a CID from the `/api/v0/cat` RPC endpoint of a local node
+
+    :param str cid: CID to retrieve
+    :param session requests.Session: Session used for the RPC call
+    :param local_gateway str: Local gateway endpoint
+    :param api_port int: Kubo RPC API port
+    :param int chunk_size: Size of each read from the response (optional)
+    """
+    with session.post(
+        f"http://{local_gateway}:{api_port}/api/v0/cat",
+        params={"arg": cid},
+        stream=True,
+        timeout=10,
+    ) as response:
+        if response.status_code != 200:
+            raise FileNotFoundError(f"Node could not resolve CID: {cid}")
+        # Size is sent once in the headers, no extra round trips needed
+        total_size = int(response.headers.get("X-Content-Length", 0))
+        return _read_with_progress(
+            response.iter_content(chunk_size), cid.rpartition("/")[2], total_size
+        )
+
+
+def fetchCID(
+    cid: str,
+    session: Optional[requests.Session] = None,
+    local_gateway: Optional[str] = None,
+    api_port: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> bytes:
     """
     Fetches data from CID
 
+    When a local node is given, content is streamed from its RPC API. Otherwise, or if
+    the node can't be reached, times out or can't serve the CID, it is read through the
+    fsspec IPFS gateways. Directory CIDs are always served by a gateway, as an HTML
+    listing.
+
     :param str cid: CID to retrieve
+    :param session requests.Session: Session used for the RPC call (optional)
+    :param local_gateway str: Local gateway endpoint (optional)
+    :param api_port int: Kubo RPC API port (optional)
+    :param int chunk_size: Size of each streamed read (optional)
     """
     try:
+        if local_gateway and api_port:
+            try:
+                return _catCID(
+                    cid,
+                    session or _DEFAULT_SESSION,
+                    local_gateway,
+                    api_port,
+                    chunk_size,
+                )
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                # cat also fails for directories, whose listing only a gateway renders
+                FileNotFoundError,
+            ):
+                pass
+
         fs = fsspec.filesystem("ipfs")
-        progress = 0
 
         with fs.open(f"ipfs://{cid}", "rb") as contents:
-            total_size = fs.size(f"ipfs://{cid}")
-            with yaspin(
-                text=f"Fetching {cid.split('/')[-1]} - {progress / 1048576:.2f}/{fs.size(f'ipfs://{cid}') / 1048576:.2f} MB",
-                color=None,
-            ) as spinner:
-                file_data = bytearray()
-
-                while True:
-                    chunk = contents.read()
-                    if not chunk:
-                        break
-                    file_data.extend(chunk)
-                    progress += len(chunk)
-                    spinner.text = f"Fetching {cid.split('/')[-1]} - {progress / 1048576:.2f}/{total_size / 1048576:.2f} MB"
-
-            if file_data:
-                spinner.ok("✅ ")
-            else:
-                spinner.fail("💥 ")
-
-            return bytes(file_data)
+            # The size is known once the file is open, so skip a separate stat call
+            total_size = contents.seek(0, os.SEEK_END)
+            contents.seek(0)
+            return _read_with_progress(
+                iter(lambda: contents.read(chunk_size), b""),
+                cid.rpartition("/")[2],
+                total_size,
+            )
     except FileNotFoundError as e:
         print(f"Could not file with CID: {cid}. Are you sure it exists?")
         raise e
 
 
+def _copy_pipelined(
+    src: Any, dst: Any, length: int = CHUNK_SIZE, depth: int = 4
+) -> None:
+    """
+    Copies a file object to another, reading ahead on a worker thread so the network
+    read of the next chunks overlaps with writing the current one
+
+    :param src: Readable binary file object
+    :param dst: Writable binary file object
+    :param int length: Size of each chunk
+    :param int depth: Maximum number of chunks buffered between reader and writer
+    """
+    chunks: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def read_ahead() -> None:
+        try:
+            while not stop.is_set():
+                chunk = src.read(length)
+                chunks.put(chunk)
+                if not chunk:
+                    return
+        except Exception as exc:
+            chunks.put(exc)
+
+    reader = threading.Thread(target=read_ahead, daemon=True)
+    reader.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if not chunk:
+                break
+            dst.write(chunk)
+    finally:
+        # Unblock the reader if the writer stopped early
+        stop.set()
+        while reader.is_alive():
+            try:
+                chunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+async def _fetch_cid(
+    session: "aiohttp.ClientSession",
+    semaphore: asyncio.Semaphore,
+    gateway_url: str,
+    cid: str,
+    api_url: Optional[str] = None,
+) -> bytes:
+    """
+    Fetches data from CID, trying the node's RPC API before the HTTP gateway
+
+    As in fetchCID, the gateway is used when the node can't be reached, times out or
+    can't serve the CID in full.
+
+    :param session: Shared aiohttp session
+    :param semaphore: Semaphore bounding the number of in-flight requests
+    :param str gateway_url: Gateway base URL (scheme, host and port)
+    :param str cid: CID to retrieve
+    :param str api_url: Kubo RPC API base URL, None to only use the gateway (optional)
+    """
+    import aiohttp
+
+    async with semaphore:
+        if api_url:
+            try:
+                async with session.post(
+                    f"{api_url}/api/v0/cat", params={"arg": cid}
+                ) as response:
+                    if response.status == 200:
+                        total_size = int(response.headers.get("X-Content-Length", 0))
+                        data = await response.read()
+                        # A stream cut short is retried on the gateway
+                        if len(data) >= total_size:
+                            return data
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+
+        async with session.get(f"{gateway_url}/ipfs/{cid}") as response:
+            if response.status != 200:
+                raise FileNotFoundError(f"Gateway could not resolve CID: {cid}")
+            return await response.read()
+
+
+async def _gather_cids(
+    gateway_url: str,
+    cids: List[str],
+    max_concurrency: int = MAX_CONCURRENT_FETCHES,
+    api_url: Optional[str] = None,
+) -> List[Union[bytes, BaseException]]:
+    """
+    Fetches several CIDs concurrently over a single aiohttp session
+
+    A failed fetch doesn't cancel the others; its exception is returned in place of
+    the content.
+
+    :param str gateway_url: Gateway base URL (scheme, host and port)
+    :param cids array: CIDs to retrieve
+    :param int max_concurrency: Maximum number of in-flight requests
+    :param str api_url: Kubo RPC API base URL, tried before the gateway (optional)
+    """
+    import aiohttp
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # Same limits as the requests calls, instead of aiohttp's 5 minute total default
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=10)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        return await asyncio.gather(
+            *[
+                _fetch_cid(session, semaphore, gateway_url, cid, api_url)
+                for cid in cids
+            ],
+            return_exceptions=True,
+        )
+
+
+def _run_sync(coro: Any) -> Any:
+    """
+    Runs a coroutine to completion from synchronous code.
+
+    If an event loop is already running in this thread (e.g. inside a Jupyter
+    notebook), the coroutine is run on a fresh loop in a worker thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def _pin_cids(
+    session: requests.Session, local_gateway: str, api_port: int, cids: List[str]
+) -> requests.Response:
+    """
+    Pins one or more CIDs to the local node with a single `pin/add` RPC call
+
+    :param session requests.Session: Session used for the RPC call
+    :param local_gateway str: Local gateway endpoint
+    :param api_port int: Kubo RPC API port
+    :param cids array: CIDs to pin
+    """
+    return session.post(
+        f"http://{local_gateway}:{api_port}/api/v0/pin/add",
+        params=[("arg", cid) for cid in cids],
+        timeout=10,
+    )
+
+
+def _remember(cid: str, data: bytes) -> None:
+    """
+    Adds content to the in-memory LRU cache, evicting the oldest entries over budget
+
+    :param str cid: CID of the content
+    :param bytes data: Content to cache
+    """
+    global _cid_cache_bytes
+    # Content larger than the whole budget would only evict everything else
+    if data and len(data) <= CID_CACHE_SIZE_LIMIT:
+        with _cid_cache_lock:
+            if cid not in _cid_cache:
+                _cid_cache[cid] = data
+                _cid_cache_bytes += len(data)
+            while _cid_cache_bytes > CID_CACHE_SIZE_LIMIT:
+                _, evicted = _cid_cache.popitem(last=False)
+                _cid_cache_bytes -= len(evicted)
+
+
+def _cache_lookup(cid: str, disk_cache: Optional[_DiskCache] = None) -> Optional[bytes]:
+    """
+    Returns cached content for a CID from memory, then from the disk cache if given
+
+    :param str cid: CID to look up
+    :param disk_cache _DiskCache: Persistent tier checked on a memory miss (optional)
+    """
+    with _cid_cache_lock:
+        if cid in _cid_cache:
+            _cid_cache.move_to_end(cid)
+            return _cid_cache[cid]
+
+    data = disk_cache.get(cid) if disk_cache is not None else None
+    if data is not None:
+        _remember(cid, data)
+    return data
+
+
+def _cache_store(
+    cid: str, data: bytes, disk_cache: Optional[_DiskCache] = None
+) -> None:
+    """
+    Stores freshly fetched content in memory and, if given, in the disk cache
+
+    :param str cid: CID of the content
+    :param bytes data: Content to cache
+    :param disk_cache _DiskCache: Persistent tier to write to (optional)
+    """
+    if data and disk_cache is not None:
+        disk_cache.set(cid, data)
+    _remember(cid, data)
+
+
+def cachedFetchCID(
+    cid: str,
+    session: Optional[requests.Session] = None,
+    local_gateway: Optional[str] = None,
+    api_port: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    disk_cache: Optional[_DiskCache] = None,
+) -> bytes:
+    """
+    Fetches data from CID, serving repeated requests from an in-memory LRU cache
+    and, when given, from a persistent disk cache
+
+    :param str cid: CID to retrieve
+    :param session requests.Session: Session used for the RPC call (optional)
+    :param local_gateway str: Local gateway endpoint (optional)
+    :param api_port int: Kubo RPC API port (optional)
+    :param int chunk_size: Size of each streamed read on a cache miss (optional)
+    :param disk_cache _DiskCache: Persistent tier checked before fetching (optional)
+    """
+    data = _cache_lookup(cid, disk_cache)
+    if data is None:
+        data = fetchCID(cid, session, local_gateway, api_port, chunk_size)
+        _cache_store(cid, data, disk_cache)
+    return data
+
+
 class Web3:
     def __init__(
         self,
@@ -85,19 +562,28 @@ class Web3:
         api_port: int = 5001,
         gateway_port: int = 8080,
         stac_endpoint: str = "",
+        cache_dir: Optional[Union[str, Path]] = None,
     ) -> None:
         """
         web3 client constructor
 
         :param str local_gateway: Local gateway endpoint without port.
         :param str stac_endpoint: STAC browser endpoint
+        :param str cache_dir: Directory for a persistent cache of fetched CIDs, e.g. `~/.cache/ipfs-stac` (optional)
         """
         self.local_gateway = local_gateway
         self.stac_endpoint = stac_endpoint
         self.daemon_status = None
+        # Pooled keep-alive connections shared by all Kubo RPC API and gateway calls
+        self._session = _new_session()
+        # Optional persistent tier behind the in-memory CID cache
+        self._disk_cache = _DiskCache(cache_dir) if cache_dir is not None else None
         self.client: Client = Client.open(self.stac_endpoint)
+        self._collections: Optional[List[Collection]] = None
         self.collections: List[str] = self._get_collections_ids()
         self.config = None
+        self._pinset_cache: Optional[set] = None
+        self._pinset_ts = 0.0
 
         self.api_port = api_port
         self.gateway_port = gateway_port
@@ -115,6 +601,10 @@ class Web3:
         # with open(config_path, "r") as f:
         #     self.config = json.load(f)
 
+    def close(self) -> None:
+        """Close the HTTP connections held by the client's session"""
+        self._session.close()
+
     def overwrite_config(self, path: Optional[Path] = None) -> None:
         """
         *only use if you know what you're doing*
@@ -122,6 +612,8 @@ class Web3:
 
         :param str path: Path to configuration file (optional)
         """
+        if self.config is None:
+            return
 
         # Get user's home directory
         home = Path.home()
@@ -130,35 +622,65 @@ class Web3:
         else:
             config_path = Path(home, ".ipfs", "config")
 
-        with Path.open(config_path, "w", encoding="utf-8") as f:
-            json.dump(self.config, f)
+        # Written atomically so a crash can't leave the node with a truncated config
+        _write_atomic(
+            Path(config_path), orjson.dumps(self.config, option=orjson.OPT_INDENT_2)
+        )
 
     def _get_collections_ids(self) -> List[str]:
         """
         Get the collection ids from the stac endpoint
         """
-        return [collection.id for collection in self.client.get_collections()]
+        return [collection.id for collection in self.getCollections()]
+
+    def clear_cache(self, include_disk: bool = False) -> None:
+        """Drop all content held in the in-memory CID cache
+
+        Args:
+            include_disk (bool, optional): Also empty the persistent disk cache, if enabled. Defaults to False.
+        """
+        global _cid_cache_bytes
+        with _cid_cache_lock:
+            _cid_cache.clear()
+            _cid_cache_bytes = 0
+        if include_disk and self._disk_cache is not None:
+            self._disk_cache.clear()
+
+    def _gateway_url(self) -> str:
+        """
+        Base URL of the HTTP gateway used for direct fetches. Falls back to the
+        first remote gateway when no local gateway is configured.
+        """
+        if self.local_gateway:
+            return f"http://{self.local_gateway}:{self.gateway_port}"
+        return REMOTE_GATEWAYS[0]
 
     def getCollections(self) -> Sequence[Collection]:
         """
         Returns list of collections from STAC endpoint
         """
-        return list(self.client.get_collections())
+        # Collections are paged from the endpoint once and reused afterwards
+        if self._collections is None:
+            self._collections = list(self.client.get_collections())
+        return list(self._collections)
+
+    def refreshCollections(self) -> List[str]:
+        """Re-read the collections from the STAC endpoint, dropping the cached listing
+
+        Returns:
+            List[str]: The refreshed collection ids
+        """
+        self._collections = None
+        self.collections = self._get_collections_ids()
+        return self.collections
 
     def _is_process_running(self) -> bool:
-        """Check if IPFS daemon process is running
+        """Check if the IPFS daemon process started by this client is running
 
         Returns:
             bool: True if process is running, False otherwise
         """
-        process_name = "ipfs"
-        for proc in psutil.process_iter(["name"]):
-            try:
-                if process_name.lower() in proc.info["name"].lower():
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        return False
+        return self.daemon_status is not None and self.daemon_status.poll() is None
 
     def shutdown_process(self) -> None:
         """Shutdown the IPFS daemon process"""
@@ -187,14 +709,21 @@ class Web3:
             Exception: If the IPFS daemon fails to start
         """
         try:
-            if not self._is_process_running():
-                self.daemon_status = subprocess.Popen(["ipfs", "daemon"])
+            # A single probe tells whether a daemon is already serving the RPC API
+            try:
+                heartbeat_response = self._session.post(
+                    f"http://{self.local_gateway}:{self.api_port}/api/v0/id",
+                    timeout=(0.5, 10),
+                )
+            except requests.exceptions.ConnectionError:
+                self.daemon_status = subprocess.Popen(
+                    ["ipfs", "daemon"],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
                 atexit.register(self.shutdown_process)
 
-            heartbeat_response = requests.post(
-                f"http://{self.local_gateway}:{self.api_port}/api/v0/id",
-                timeout=10,
-            )
+                heartbeat_response = self._wait_for_daemon()
             if heartbeat_response.status_code != 200:
                 warnings.warn(
                     "IPFS Daemon is running but still can't connect. Check your IPFS configuration."
@@ -203,20 +732,109 @@ class Web3:
             print(f"Error starting IPFS daemon: {exc}")
             raise Exception("Failed to start IPFS daemon")
 
-    def getFromCID(self, cid: str) -> Union[bytes, None]:
+    def _wait_for_daemon(self) -> requests.Response:
+        """Probe the RPC API, backing off exponentially until the daemon accepts connections
+
+        Returns:
+            requests.Response: Response of the first successful `/api/v0/id` call
+
+        Raises:
+            requests.exceptions.ConnectionError: If the daemon is still unreachable after the last retry
+        """
+        url = f"http://{self.local_gateway}:{self.api_port}/api/v0/id"
+        for delay in DAEMON_STARTUP_BACKOFF:
+            try:
+                return self._session.post(url, timeout=10)
+            except requests.exceptions.ConnectionError:
+                time.sleep(delay)
+        return self._session.post(url, timeout=10)
+
+    def getFromCID(self, cid: str, chunk_size: int = CHUNK_SIZE) -> Union[bytes, None]:
         """
         Retrieves raw data from CID
 
         :param str cid: CID to retrieve
+        :param int chunk_size: Size of each streamed read (optional)
         """
         content_cid = None
         try:
-            content_cid = fetchCID(cid)
+            content_cid = cachedFetchCID(
+                cid,
+                self._session,
+                self.local_gateway,
+                self.api_port,
+                chunk_size,
+                self._disk_cache,
+            )
         except FileNotFoundError as e:
             print(f"Could not file with CID: {cid}. Are you sure it exists?")
             raise e
         return content_cid
 
+    def getFromCIDs(self, cids: List[str]) -> Dict[str, bytes]:
+        """Retrieve raw data for several CIDs concurrently
+
+        Each CID is read from the node's RPC API first, then from the local gateway (or
+        the first remote gateway) rather than the fsspec gateways used by getFromCID.
+        Content already in the CID caches is not requested again.
+
+        Args:
+            cids (List[str]): CIDs to retrieve
+
+        Returns:
+            Dict[str, bytes]: Retrieved data keyed by CID. It only ever holds content that
+                was fetched; a failed CID raises instead of being returned
+
+        Raises:
+            FileNotFoundError: If one of the CIDs can't be resolved. The CIDs that were
+                fetched are cached first, so a retry only requests the failed ones
+            aiohttp.ClientError: If the gateway can't be reached or times out
+        """
+        contents = self._fetch_many(cids, max_concurrency=16)
+        for cid, data in contents.items():
+            if isinstance(data, FileNotFoundError):
+                print(f"Could not file with CID: {cid}. Are you sure it exists?")
+            if isinstance(data, BaseException):
+                raise data
+        return contents
+
+    def _fetch_many(
+        self, cids: List[str], max_concurrency: int = MAX_CONCURRENT_FETCHES
+    ) -> Dict[str, Union[bytes, BaseException]]:
+        """Fetch several CIDs concurrently, serving what it can from the CID caches
+
+        Each CID is read from the node's RPC API first, then from `_gateway_url`.
+
+        Args:
+            cids (List[str]): CIDs to retrieve
+            max_concurrency (int, optional): Maximum number of in-flight requests. Defaults to MAX_CONCURRENT_FETCHES.
+
+        Returns:
+            Dict[str, Union[bytes, BaseException]]: Content keyed by CID, or the exception raised fetching it
+        """
+        contents: Dict[str, Union[bytes, BaseException, None]] = {
+            cid: _cache_lookup(cid, self._disk_cache) for cid in cids
+        }
+        missing = [cid for cid, data in contents.items() if data is None]
+        if missing:
+            fetched = _run_sync(
+                _gather_cids(
+                    self._gateway_url(),
+                    missing,
+                    max_concurrency=max_concurrency,
+                    api_url=(
+                        f"http://{self.local_gateway}:{self.api_port}"
+                        if self.local_gateway and self.api_port
+                        else None
+                    ),
+                )
+            )
+            for cid, data in zip(missing, fetched):
+                if not isinstance(data, BaseException):
+                    _cache_store(cid, data, self._disk_cache)
+                contents[cid] = data
+        return contents
+
     def searchSTACByBox(
         self, bbox: List[float], collections: List[str]
     ) -> ItemCollection:
@@ -226,14 +844,58 @@ class Web3:
         :param bbox array: Array of coordinates for bounding box
         :param collections array: Array of collection names
         """
-        catalog = Client.open(self.stac_endpoint)
-        search_results = catalog.search(
+        search_results = self.client.search(
             collections=collections,
             bbox=bbox,
         )
 
         return search_results.item_collection()
 
+    def searchAndPrefetch(
+        self,
+        bbox: List[float],
+        collections: List[str],
+        assets: List[str],
+        max_inflight: int = 4,
+    ) -> Iterator[Tuple[Item, Dict[str, "Asset"]]]:
+        """Search STAC catalog by bounding box, fetching the assets of upcoming items in the background
+
+        While the caller processes one item, the assets of up to `max_inflight` following
+        items are already being downloaded, which keeps at most that many items in memory.
+
+        Args:
+            bbox (List[float]): Array of coordinates for bounding box
+            collections (List[str]): Array of collection names
+            assets (List[str]): Names of the assets to fetch for every item
+            max_inflight (int, optional): Number of items fetched ahead of the caller. Defaults to 4.
+
+        Yields:
+            Tuple[Item, Dict[str, Asset]]: Each item with its fetched assets, keyed by asset name
+        """
+
+        def fetch_item_assets(item: Item) -> Tuple[Item, Dict[str, "Asset"]]:
+            item_assets = {}
+            for name in assets:
+                asset = self.getAssetFromItem(item, name, fetch_data=True)
+                if asset is not None:
+                    item_assets[name] = asset
+            return item, item_assets
+
+        search_results = self.client.search(collections=collections, bbox=bbox)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_inflight) as executor:
+            try:
+                for item in search_results.items():
+                    pending.append(executor.submit(fetch_item_assets, item))
+                    if len(pending) >= max_inflight:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                # Don't download items the caller will never see
+                for future in pending:
+                    future.cancel()
+
     def searchSTAC(self, **kwargs) -> ItemCollection:
         """
         Search STAC catalog for items using the search method from pystac-client.
@@ -276,13 +938,21 @@ class Web3:
         ):
             raise ValueError("bbox must be a list of four float numbers")
 
-        catalog = Client.open(self.stac_endpoint)
-        search_results = catalog.search(
+        # Negative indexes need the full result set to count from the end,
+        # otherwise the search stops paging once the requested item is reached
+        search_results = self.client.search(
             collections=collections,
             bbox=bbox,
+            max_items=index + 1 if index >= 0 else None,
         )
 
-        return search_results.item_collection()[index]
+        if index < 0:
+            return search_results.item_collection()[index]
+
+        try:
+            return next(islice(search_results.items(), index, index + 1))
+        except StopIteration:
+            raise IndexError(f"No item at index {index} for this search") from None
 
     def getAssetNames(
         self, stac_obj: Union[CollectionClient, ItemCollection, Item]
@@ -296,19 +966,19 @@ class Web3:
             List[str]: A sorted list of unique asset names.
         """
 
-        def get_asset_names_from_items(items: List[Item]) -> List[str]:
+        def get_asset_names_from_items(items: Iterable[Item]) -> List[str]:
             """Get asset names from list of items
 
             Args:
-                items (List[Item]): List of STAC item objects
+                items (Iterable[Item]): STAC item objects
 
             Returns:
                 List[str]: A sorted list of unique asset names.
             """
             asset_names = set()
             for item in items:
-                names = list(item.get_assets().keys())
-                asset_names.update(names)
+                # Iterating the assets dict yields its keys without copying it
+                asset_names.update(item.assets)
             return sorted(asset_names)
 
         if not stac_obj:
@@ -318,19 +988,17 @@ class Web3:
 
         if isinstance(stac_obj, CollectionClient):
             try:
-                items = stac_obj.get_items()
-                return get_asset_names_from_items(list(items))
+                return get_asset_names_from_items(stac_obj.get_items())
             except Exception as e:
                 print(f"Error with getting asset names: {e}")
         elif isinstance(stac_obj, ItemCollection):
             try:
-                items = stac_obj.items
-                return get_asset_names_from_items(list(items))
+                return get_asset_names_from_items(stac_obj.items)
             except Exception as e:
                 print(f"Error with getting asset names: {e}")
         elif isinstance(stac_obj, Item):
             try:
-                return sorted(stac_obj.get_assets().keys())
+                return sorted(stac_obj.assets)
             except Exception as e:
                 print(f"Error with getting asset names: {e}")
         else:
@@ -352,45 +1020,79 @@ class Web3:
             Asset: Asset object
         """
         try:
-            item_dict = item.to_dict()
-            cid = item_dict["assets"][f"{asset_name}"]["alternate"]["IPFS"][
-                "href"
-            ].split("/")[-1]
+            # Read the asset directly rather than serializing the whole item with to_dict()
+            alternate = item.assets[asset_name].extra_fields["alternate"]
+            cid = alternate["IPFS"]["href"].rpartition("/")[2]
             return Asset(
                 cid,
                 self.local_gateway,
                 self.api_port,
                 fetch_data=fetch_data,
                 name=asset_name,
+                session=self._session,
+                pinset=self.pinset,
+                gateway_port=self.gateway_port,
+                disk_cache=self._disk_cache,
             )
         except Exception as e:
             print(f"Error with getting asset: {e}")
 
     def getAssetsFromItem(
-        self, item: Item, assets: List[str]
+        self, item: Item, assets: List[str], fetch_data: bool = False
     ) -> Union[List["Asset"], None]:
         """
         Returns array of asset objects from item
 
         :param item: STAC catalog item
         :param asset array: Names of asset to return (strings)
+        :param fetch_data bool: Fetch data for all assets concurrently, as getFromCIDs does
         """
         try:
-            assetArray = []
-
-            for i in assets:
-                assetArray.append(self.getAssetFromItem(item, i, fetch_data=False))
+            # getAssetFromItem handles its own errors, returning None for that asset
+            assetArray = [
+                self.getAssetFromItem(item, name, fetch_data=False) for name in assets
+            ]
+
+            if fetch_data:
+                fetchable = [asset for asset in assetArray if asset is not None]
+                contents = self._fetch_many([asset.cid for asset in fetchable])
+                for asset in fetchable:
+                    data = contents[asset.cid]
+                    # A failed fetch leaves that asset's data unset
+                    if isinstance(data, BaseException):
+                        print(f"Error with CID fetch: {data}")
+                    else:
+                        asset.data = data
 
             return assetArray
         except Exception as e:
             print(f"Error with getting assets: {e}")
 
-    def writeCID(self, cid: str, filePath: Union[str, Path]) -> None:
+    def fetchAssets(self, assets: List["Asset"], max_workers: int = 8) -> None:
+        """Fetch data for several assets in parallel using a thread pool
+
+        Each asset is fetched with `Asset.fetch`, through the CID caches. Content that
+        isn't cached is streamed from the node's `/api/v0/cat` RPC endpoint, falling back
+        to the fsspec gateways. The reads release the GIL while waiting on the network.
+        Very high worker counts against a single local kubo daemon tend to reduce
+        throughput rather than improve it, hence the conservative default.
+
+        Args:
+            assets (List[Asset]): Assets to fetch
+            max_workers (int, optional): Maximum number of concurrent fetches. Defaults to 8.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda asset: asset.fetch(), assets))
+
+    def writeCID(
+        self, cid: str, filePath: Union[str, Path], chunk_size: int = 1024 * 1024
+    ) -> None:
         """
         Write CID contents to local file system (WIP)
 
         :param CID str: CID to retrieve
         :param filePath str: Directory to write contents to
+        :param int chunk_size: Size of each chunk copied to disk (optional)
         """
         try:
             # Check filepath instance and convert to Path object if necessary
@@ -398,12 +1100,10 @@ class Web3:
                 filePath = Path(filePath).resolve()
             else:
                 filePath = filePath.resolve()
-            data_payload = bytes()
+            # Stream contents to the local file path in fixed-size chunks
             with fsspec.open(f"ipfs://{cid}", "rb") as contents:
-                data_payload = contents.read()
-                # Write data to local file path
-            with filePath.open("wb") as copy:
-                copy.write(data_payload)
+                with filePath.open("wb") as copy:
+                    _copy_pipelined(contents, copy, length=chunk_size)
         except Exception as e:
             print(f"Error with CID write: {e}")
 
@@ -442,47 +1142,39 @@ class Web3:
         if chunker:
             param_options = f"{param_options}&chunker={chunker}"
 
-        # Define empty payload dictionary
-        components = {"content": b"", "name": None}
-
-        # Check the type of content and handle accordingly
+        # Check the type of content and open it as a binary stream
         if isinstance(content, bytes):
-            components["content"] = content
-            if not file_name:
-                components["name"] = None
+            name = file_name or "file"
+            stream = BytesIO(content)
         elif isinstance(content, (str, Path)):
             file_path = Path(content).resolve()
-            if file_path.exists():
-                with Path.open(file_path) as f:
-                    components["content"] = f.read()
-                    components["name"] = file_path.name
-                # Override the file name if user provides one
-                if file_name:
-                    components["name"] = file_name
-            else:
+            if not file_path.exists():
                 raise FileNotFoundError(
                     f"The file path provided does not exist. Please check {content}"
                 )
+            # Override the file name if user provides one
+            name = file_name or file_path.name
+            stream = file_path.open("rb")
         else:
             raise ValueError("`content` must be of type `Union[str, Path, bytes]`.")
 
-        # put the components together as a file payload
-        if components["name"] is not None:
-            file_payload = {"file": (components["name"], components["content"])}
-        else:
-            file_payload = {"file": components["content"]}
-
         try:
-            response = requests.post(
-                f"http://{self.local_gateway}:{self.api_port}/api/v0/add?{param_options}",
-                files=file_payload,
-                timeout=10,
-            )
+            # Stream the multipart body from the file instead of buffering it in memory
+            with stream:
+                encoder = MultipartEncoder(
+                    fields={"file": (name, stream, "application/octet-stream")}
+                )
+                response = self._session.post(
+                    f"http://{self.local_gateway}:{self.api_port}/api/v0/add?{param_options}",
+                    data=encoder,
+                    headers={"Content-Type": encoder.content_type},
+                    timeout=10,
+                )
             response.raise_for_status()  # Raise an exception for HTTP errors
 
             # response.raise_for_status()  # Raise an exception for HTTP errors
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 print(
                     f"Successfully added, {data['Name']}, to IPFS. CID: {data['Hash']}"
                 )
@@ -510,37 +1202,102 @@ class Web3:
         """
         # Setting param options
         param_options = f"type={pin_type}&names={names}"
-        response = requests.post(
+        response = self._session.post(
             f"http://{self.local_gateway}:{self.api_port}/api/v0/pin/ls?{param_options}",
             timeout=10,
         )
 
         if response.status_code == 200:
-            if response.json() != {}:
+            body = orjson.loads(response.content)
+            if body:
                 if names:
-                    return list(response.json())
+                    return list(body)
                 else:
-                    return list(response.json()["Keys"].keys())
+                    return list(body["Keys"])
         else:
             print("Error fetching pinned CIDs")
             return [""]
 
-    def getCSVDataframeFromCID(self, cid: str) -> pd.DataFrame:
+    def pinset(self, ttl: float = 30) -> set:
+        """Return the recursively pinned CIDs of the local node as a set
+
+        The pin list is fetched with a single RPC call and reused for `ttl` seconds, so
+        checking many assets against it costs one round trip instead of one per asset.
+
+        Args:
+            ttl (float, optional): Seconds before the cached pin list is refreshed. Defaults to 30.
+
+        Returns:
+            set: Pinned CIDs
+        """
+        if self._pinset_cache is None or time.time() - self._pinset_ts > ttl:
+            self._pinset_cache = set(self.pinned_list() or []) - {""}
+            self._pinset_ts = time.time()
+        return self._pinset_cache
+
+    def pin_many(self, cids: List[str]) -> List[str]:
+        """Pin several CIDs to the local node in a single RPC call
+
+        Args:
+            cids (List[str]): CIDs to pin
+
+        Returns:
+            List[str]: CIDs reported as pinned by the node. Empty if the request failed.
+        """
+        response = _pin_cids(self._session, self.local_gateway, self.api_port, cids)
+
+        if response.status_code == 200:
+            pinned = orjson.loads(response.content).get("Pins", [])
+            if self._pinset_cache is not None:
+                self._pinset_cache.update(pinned)
+            return pinned
+        else:
+            print("Error pinning data")
+            return []
+
+    def pinAssets(self, assets: List["Asset"]) -> List[str]:
+        """Pin several assets to the local node in a single RPC call
+
+        Args:
+            assets (List[Asset]): Assets to pin
+
+        Returns:
+            List[str]: CIDs reported as pinned by the node. Empty if the request failed.
+        """
+        pinned = self.pin_many([asset.cid for asset in assets])
+        if pinned:
+            for asset in assets:
+                asset.is_pinned = True
+        return pinned
+
+    def getCSVDataframeFromCID(
+        self, cid: str, engine: Optional[str] = None
+    ) -> "pd.DataFrame":
         """
         Parse CSV CID to pandas dataframe
 
         :param str cid: CID to retrieve
+        :param str engine: pandas CSV parser engine, e.g. "pyarrow" for its multithreaded
+            reader. Column types can differ between engines. Defaults to pandas' own (optional)
         """
+        import pandas as pd
+
         try:
             data = self.getFromCID(cid)
 
+            # CIDs that hold the CSV itself are parsed directly; only a gateway
+            # directory listing needs the second request below
+            if not data[:512].lstrip().startswith(b"<"):
+                return pd.read_csv(BytesIO(data), engine=engine)
+
             # Parse for contents endpoint
-            soup = BeautifulSoup(data, "html.parser")
-            endpoint = f"{soup.find_all('a')[0].get('href').replace('.tech', '.io')}{soup.find_all('a')[-1].get('href')}"
+            anchors = _ANCHOR_HREFS(lxml_html.fromstring(data))
+            endpoint = f"{anchors[0].replace('.tech', '.io')}{anchors[-1]}"
 
-            response = requests.get(endpoint, timeout=10)
-            csv_data = StringIO(response.text)
-            df = pd.read_csv(csv_data)
+            # Let pandas parse straight from the socket instead of buffering the body
+            with self._session.get(endpoint, stream=True, timeout=10) as response:
+                response.raw.decode_content = True
+                df = pd.read_csv(response.raw, engine=engine)
 
             return df
         except Exception as e:
@@ -558,18 +1315,33 @@ class Asset:
         api_port: int,
         fetch_data: bool = False,
         name: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        pinset: Optional[Callable[[], set]] = None,
+        gateway_port: int = 8080,
+        disk_cache: Optional[_DiskCache] = None,
     ) -> None:
         """
         Constructor for asset object
 
         :param cid str: The CID associated with the object
         :param local_gateway str: Local gateway endpoint
+        :param session requests.Session: Session used for Kubo RPC API calls (optional)
+        :param pinset callable: Returns the node's recursively pinned CIDs, e.g. `Web3.pinset` (optional)
+        :param gateway_port int: Port of the local gateway, used for ranged raster reads (optional)
+        :param disk_cache _DiskCache: Persistent CID cache of the client that created the asset (optional)
         """
         self.cid: str = cid
         self.local_gateway = local_gateway
         self.api_port = api_port
+        self.gateway_port = gateway_port
+        self._session = session if session is not None else _DEFAULT_SESSION
+        self._pinset = pinset
+        self._disk_cache = disk_cache
         self.data: Optional[bytes] = None
         self.is_pinned = False
+        # MemoryFile built from `data`, kept for repeated raster reads
+        self._memfile: "Optional[MemoryFile]" = None
+        self._memfile_source: Optional[bytes] = None
 
         if name:
             self.name = name
@@ -586,41 +1358,70 @@ class Asset:
         """
         Check if CID is pinned to local node
         """
-        resp = requests.post(
+        if self._pinset is not None and self.cid in self._pinset():
+            self.is_pinned = True
+            return True
+
+        # The pinset only lists recursive pins, so a miss is confirmed with the node,
+        # which also matches direct and indirect pins
+        resp = self._session.post(
             f"http://{self.local_gateway}:{self.api_port}/api/v0/pin/ls?arg=/ipfs/{self.cid}",
             timeout=10,
         )
-        if (resp.json().get("Keys")) and self.cid in resp.json()["Keys"]:
+        body = orjson.loads(resp.content)
+        if body.get("Keys") and self.cid in body["Keys"]:
             self.is_pinned = True
             return True
-        elif resp.json()["Type"] == "error":
+        elif body.get("Type") == "error":
             return False
         else:
             print("Error checking if CID is pinned")
-            print(resp.json())
+            print(body)
             return False
 
-    def fetch(self) -> None:
+    def fetch(self, chunk_size: int = CHUNK_SIZE, use_cache: bool = True) -> None:
+        """
+        Fetch the asset's data
+
+        :param int chunk_size: Size of each streamed read (optional)
+        :param bool use_cache: Serve repeat fetches from, and store the data in, the CID cache (optional)
+        """
         try:
-            self.data = fetchCID(self.cid)
+            if use_cache:
+                self.data = cachedFetchCID(
+                    self.cid,
+                    self._session,
+                    self.local_gateway,
+                    self.api_port,
+                    chunk_size,
+                    self._disk_cache,
+                )
+            else:
+                self.data = fetchCID(
+                    self.cid,
+                    self._session,
+                    self.local_gateway,
+                    self.api_port,
+                    chunk_size,
+                )
         except Exception as e:
             print(f"Error with CID fetch: {e}")
 
     # Pin to local kubo node
-    # @ensure_data_fetched
     def pin(self) -> None:
         self._is_pinned_to_local_node()
         if self.is_pinned:
             print("Content is already pinned")
         else:
-            response = requests.post(
-                f"http://{self.local_gateway}:{self.api_port}/api/v0/pin/add?arg={self.cid}",
-                timeout=10,
+            response = _pin_cids(
+                self._session, self.local_gateway, self.api_port, [self.cid]
             )
 
             if response.status_code == 200:
                 print("Data pinned successfully")
                 self.is_pinned = True
+                if self._pinset is not None:
+                    self._pinset().add(self.cid)
 
             else:
                 print("Error pinning data")
@@ -635,7 +1436,7 @@ class Asset:
         if filename is None or filename == "":
             filename = self.name
 
-        response = requests.post(
+        response = self._session.post(
             f"http://{self.local_gateway}:{self.api_port}/api/v0/files/cp?arg=/ipfs/{self.cid}&arg={mfs_path}/{filename}",
             timeout=10,
         )
@@ -645,10 +1446,113 @@ class Asset:
         else:
             print("Error adding data to MFS")
 
+    def _get_memfile(self) -> "MemoryFile":
+        """
+        Return a MemoryFile over the asset data, rebuilt only when the data changes
+        """
+        from rasterio.io import MemoryFile
+
+        if self._memfile is None or self._memfile_source is not self.data:
+            if self._memfile is not None:
+                self._memfile.close()
+            # MemoryFile only takes immutable bytes, which GDAL then reads without copying
+            data = self.data if isinstance(self.data, bytes) else bytes(self.data)
+            self._memfile = MemoryFile(data)
+            self._memfile_source = self.data
+        return self._memfile
+
+    def _read_remote(self, indexes: Union[int, List[int]], **kwargs) -> np.ndarray:
+        """
+        Read bands straight from the local gateway, letting GDAL issue range
+        requests for only the tiles that are needed
+        """
+        import rasterio
+
+        url = f"http://{self.local_gateway}:{self.gateway_port}/ipfs/{self.cid}"
+        with rasterio.Env(
+            GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR",
+            GDAL_HTTP_MULTIPLEX="YES",
+            CPL_VSIL_CURL_USE_HEAD="NO",
+            VSI_CACHE="TRUE",
+            # Same limits as the requests session: 10 s timeouts, 3 retries on 5xx
+            GDAL_HTTP_CONNECTTIMEOUT="10",
+            GDAL_HTTP_TIMEOUT="10",
+            GDAL_HTTP_MAX_RETRY="3",
+            GDAL_HTTP_RETRY_DELAY="0.2",
+        ):
+            with rasterio.open(f"/vsicurl/{url}") as dataset:
+                return dataset.read(indexes, **kwargs)
+
     # Returns asset as np array if image
-    @ensure_data_fetched
-    def to_np_ndarray(self, dtype: Union[np.dtype, type] = np.float32) -> np.ndarray:
+    def to_np_ndarray(
+        self,
+        dtype: Optional[Union[np.dtype, type]] = None,
+        window: "Optional[Window]" = None,
+        out_shape: Optional[Tuple[int, int]] = None,
+        out: Optional[np.ndarray] = None,
+        bands: Optional[Sequence[int]] = None,
+    ) -> np.ndarray:
+        """
+        Read the first band, or the given bands, of the asset as a numpy array
+
+        :param dtype: Data type of the returned array. Defaults to the raster's native data type (optional)
+        :param window Window: Region of the raster to read. Defaults to the full extent (optional)
+        :param out_shape tuple: Shape of the returned array. A shape smaller than the window is
+            resampled from the raster overviews when available (optional)
+        :param out np.ndarray: Preallocated array to read into, allowing one buffer to be reused
+            across many reads. Its shape and dtype take precedence over `out_shape` and `dtype` (optional)
+        :param bands list: 1-based indexes of the bands to read in a single pass, returned as a
+            (bands, rows, cols) array. Defaults to the first band as a 2D array (optional)
+
+        When the data hasn't been fetched and only a window or a reduced shape is requested,
+        the raster is read through the local gateway without downloading the whole asset.
+        """
+        from rasterio.errors import RasterioIOError
+
+        indexes = 1 if bands is None else list(bands)
+        if self.data is None and (window is not None or out_shape is not None):
+            try:
+                return self._read_remote(
+                    indexes,
+                    window=window,
+                    out_shape=out_shape,
+                    out=out,
+                    out_dtype=dtype if out is None else None,
+                )
+            except RasterioIOError:
+                pass
+
+        if self.data is None:
+            print("Data for asset has not been fetched yet. Fetching now...")
+            self.fetch()
         if self.data is None:
             raise ValueError("Data for asset has not been fetched yet")
-        with rasterio.open(BytesIO(self.data)) as dataset:
-            return dataset.read(1).astype(dtype)
+        with self._get_memfile().open() as dataset:
+            # The cast to dtype is fused with decoding rather than done in a second pass
+            return dataset.read(
+                indexes,
+                window=window,
+                out_shape=out_shape,
+                out=out,
+                out_dtype=dtype if out is None else None,
+            )
+
+    def to_float32(
+        self,
+        window: "Optional[Window]" = None,
+        out_shape: Optional[Tuple[int, int]] = None,
+        bands: Optional[Sequence[int]] = None,
+    ) -> np.ndarray:
+        """
+        Read the first band, or the given bands, of the asset as a float32 numpy array
+
+        :param window Window: Region of the raster to read. Defaults to the full extent (optional)
+        :param out_shape tuple: Shape of the returned array (optional)
+        :param bands list: 1-based indexes of the bands to read (optional)
+        """
+        return self.to_np_ndarray(
+            dtype=np.float32, window=window, out_shape=out_shape, bands=bands
+        )
+
+
+__all__ = ["Web3", "Asset", "fetchCID", "cachedFetchCID"]
@@ -9,18 +9,21 @@ setup(
     author="The EASIER Data Initiative",
     license="MIT",
     install_requires=[
+        "aiohttp",
         "ipfsspec",
         "fsspec",
         "requests",
+        "requests-toolbelt",
+        "orjson",
         "pandas",
-        "beautifulsoup4",
+        "lxml",
         "pystac-client",
         "Pillow",
         "numpy",
         "rasterio",
         "yaspin",
-        "psutil",
     ],
+    extras_require={"arrow": ["pyarrow"]},
     setup_requires=["pytest-runner"],
     tests_require=["pytest"],
     test_suite="tests",
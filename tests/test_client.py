@@ -1,18 +1,32 @@
 ## Standard Library Imports
 from pathlib import Path
-from unittest.mock import Mock, mock_open, patch, MagicMock
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock, mock_open, patch, MagicMock
 from io import BytesIO
+import asyncio
 import subprocess
+import tempfile
+import threading
 import numpy as np
 import requests
 import time
 
 ## Third Party Imports
-from pystac import Item
+import orjson
+from pystac import Item, ItemCollection
 from PIL import Image
+from rasterio.windows import Window
 
 ## Local Imports
-from ipfs_stac.client import Web3, Asset
+from ipfs_stac.client import (
+    CHUNK_SIZE,
+    MAX_CONCURRENT_FETCHES,
+    Web3,
+    Asset,
+    _DiskCache,
+    _copy_pipelined,
+    _gather_cids,
+)
 
 from .base import SetUp, import_configuration
 
@@ -86,6 +100,18 @@ class TestWeb3(SetUp):
         mock_catalog.search.assert_called_once_with(collections=collections, bbox=bbox)
         mock_search.item_collection.assert_called_once()
         mock_catalog.get_collections.assert_called_once()
+        # The catalog opened by the constructor is reused for searches
+        mock_open.assert_called_once_with(SAMPLE_STAC_ENDPOINT_URL)
+
+        # Collections listed by the constructor are reused as well
+        self.assertEqual(client.getCollections(), mock_collections)
+        mock_catalog.get_collections.assert_called_once()
+
+        # An explicit refresh lists them again
+        mock_catalog.get_collections.return_value = [Mock(id="collection3")]
+        self.assertEqual(client.refreshCollections(), ["collection3"])
+        self.assertEqual(client.collections, ["collection3"])
+        self.assertEqual(mock_catalog.get_collections.call_count, 2)
 
     @patch("pystac_client.client.Client.open")
     def test_searchSTACByBoxIndex(self, mock_open):
@@ -93,7 +119,9 @@ class TestWeb3(SetUp):
         mock_catalog = Mock()
         mock_search = Mock()
         mock_catalog.search.return_value = mock_search
-        mock_search.item_collection.return_value = [Mock(id="item1"), Mock(id="item2")]
+        mock_search.items.side_effect = lambda: iter(
+            [Mock(id="item1"), Mock(id="item2"), Mock(id="item3")]
+        )
 
         mock_collections = [Mock(id="collection1"), Mock(id="collection2")]
         mock_catalog.get_collections.return_value = mock_collections
@@ -113,8 +141,55 @@ class TestWeb3(SetUp):
         # Assert that the correct item was returned
         self.assertEqual(result.id, "item2")
 
-        mock_catalog.search.assert_called_once_with(collections=collections, bbox=bbox)
-        mock_search.item_collection.assert_called_once()
+        mock_catalog.search.assert_called_once_with(
+            collections=collections, bbox=bbox, max_items=index + 1
+        )
+        mock_search.items.assert_called_once()
+        mock_search.item_collection.assert_not_called()
+
+        # Indexes past the end of the results raise IndexError
+        with self.assertRaises(IndexError):
+            client.searchSTACByBoxIndex(bbox, collections, 5)
+
+    @patch("ipfs_stac.client.fetchCID")
+    def test_searchAndPrefetch(self, mock_fetchCID):
+        self.client.clear_cache()
+        mock_fetchCID.side_effect = lambda cid, *args: f"data-{cid}".encode()
+        items = [
+            Item.from_dict(
+                {
+                    "stac_version": "1.0.0",
+                    "type": "Feature",
+                    "id": f"item{i}",
+                    "bbox": [],
+                    "geometry": {},
+                    "properties": {"datetime": "2021-01-01T00:00:00Z"},
+                    "links": [],
+                    "assets": {
+                        "red": {
+                            "href": "/path/to/red",
+                            "alternate": {"IPFS": {"href": f"/path/to/red{i}"}},
+                        }
+                    },
+                }
+            )
+            for i in range(5)
+        ]
+        with patch.object(self.client, "client") as mock_catalog:
+            mock_catalog.search.return_value.items.return_value = iter(items)
+            results = list(
+                self.client.searchAndPrefetch(
+                    [10.0, 20.0, 30.0, 40.0], ["collection1"], ["red"], max_inflight=2
+                )
+            )
+
+        self.assertEqual(
+            [item.id for item, _ in results], [f"item{i}" for i in range(5)]
+        )
+        self.assertEqual(
+            [assets["red"].data for _, assets in results],
+            [f"data-red{i}".encode() for i in range(5)],
+        )
 
     def test_getAssetFromItem(self):
         item_dict = {
@@ -134,8 +209,37 @@ class TestWeb3(SetUp):
             },
         }
         item = Item.from_dict(item_dict)
-        asset = self.client.getAssetFromItem(item, "asset1")
+        with patch("ipfs_stac.client.fetchCID") as mock_fetchCID, patch.object(
+            Item, "to_dict"
+        ) as mock_to_dict:
+            asset = self.client.getAssetFromItem(item, "asset1")
+            mock_fetchCID.assert_not_called()
+            mock_to_dict.assert_not_called()
         self.assertEqual(str(asset), "cid")
+        assert asset is not None
+        self.assertIsNone(asset.data)
+
+    def test_getAssetNames(self):
+        items = [
+            Item.from_dict(
+                {
+                    "stac_version": "1.0.0",
+                    "type": "Feature",
+                    "id": f"test_item_{i}",
+                    "bbox": [],
+                    "geometry": {},
+                    "properties": {"datetime": "2021-01-01T00:00:00Z"},
+                    "links": [],
+                    "assets": {name: {"href": f"/path/to/{name}"} for name in names},
+                }
+            )
+            for i, names in enumerate([["red", "nir"], ["blue", "red"]])
+        ]
+
+        self.assertEqual(
+            self.client.getAssetNames(ItemCollection(items)), ["blue", "nir", "red"]
+        )
+        self.assertEqual(self.client.getAssetNames(items[0]), ["nir", "red"])
 
     def test_getAssetsFromItem(self):
         item_dict = {
@@ -166,6 +270,269 @@ class TestWeb3(SetUp):
         self.assertEqual(str(assetArray[0]), "cid1")
         self.assertEqual(str(assetArray[1]), "cid2")
 
+        # Invalid arguments are reported rather than raised
+        self.assertIsNone(self.client.getAssetsFromItem(item, None))
+
+    @patch("ipfs_stac.client._gather_cids", new_callable=AsyncMock)
+    def test_getAssetsFromItem_fetch_data(self, mock_gather):
+        item_dict = {
+            "stac_version": "1.0.0",
+            "type": "Feature",
+            "id": "test_item",
+            "bbox": [],
+            "geometry": {},
+            "properties": {"datetime": "2021-01-01T00:00:00Z"},
+            "collection": "simple-collection",
+            "links": [],
+            "assets": {
+                "asset1": {
+                    "href": "/path/to/top-level-href",
+                    "alternate": {"IPFS": {"href": "/path/to/cid1"}},
+                },
+                "asset2": {
+                    "href": "/path/to/another-href",
+                    "alternate": {"IPFS": {"href": "/path/to/cid2"}},
+                },
+            },
+        }
+        self.client.clear_cache()
+        mock_gather.return_value = [b"data1", FileNotFoundError("cid2")]
+        item = Item.from_dict(item_dict)
+        assetArray = self.client.getAssetsFromItem(
+            item, ["asset1", "asset2"], fetch_data=True
+        )
+        assert assetArray is not None
+        mock_gather.assert_awaited_once_with(
+            f"http://{LOCAL_GATEWAY}:{GATEWAY_PORT}",
+            ["cid1", "cid2"],
+            max_concurrency=MAX_CONCURRENT_FETCHES,
+            api_url=f"http://{LOCAL_GATEWAY}:{API_PORT}",
+        )
+        # The failed fetch only affects its own asset
+        self.assertEqual(assetArray[0].data, b"data1")
+        self.assertIsNone(assetArray[1].data)
+
+        # Fetched content is cached, so only the failed CID is requested again
+        mock_gather.return_value = [b"data2"]
+        assetArray = self.client.getAssetsFromItem(
+            item, ["asset1", "asset2"], fetch_data=True
+        )
+        mock_gather.assert_awaited_with(
+            f"http://{LOCAL_GATEWAY}:{GATEWAY_PORT}",
+            ["cid2"],
+            max_concurrency=MAX_CONCURRENT_FETCHES,
+            api_url=f"http://{LOCAL_GATEWAY}:{API_PORT}",
+        )
+        self.assertEqual([asset.data for asset in assetArray], [b"data1", b"data2"])
+
+    @patch("ipfs_stac.client.fetchCID")
+    def test_getFromCID_cache(self, mock_fetchCID):
+        self.client.clear_cache()
+        mock_fetchCID.return_value = b"cached data"
+
+        self.assertEqual(self.client.getFromCID("cached_cid"), b"cached data")
+        self.assertEqual(self.client.getFromCID("cached_cid"), b"cached data")
+        mock_fetchCID.assert_called_once_with(
+            "cached_cid", self.client._session, LOCAL_GATEWAY, API_PORT, CHUNK_SIZE
+        )
+
+        self.client.clear_cache()
+        self.client.getFromCID("cached_cid")
+        self.assertEqual(mock_fetchCID.call_count, 2)
+
+    @patch("requests.Session.post")
+    def test_getFromCID_streams_from_node_mock(self, mock_post):
+        self.client.clear_cache()
+        response = mock_post.return_value.__enter__.return_value
+        response.status_code = 200
+        response.headers = {"X-Content-Length": "12"}
+        response.iter_content.return_value = [b"hello ", b"world!"]
+
+        data = self.client.getFromCID("cat_cid")
+        self.assertEqual(data, b"hello world!")
+        # Cached content is shared between callers, so it must be immutable
+        self.assertIsInstance(data, bytes)
+        mock_post.assert_called_once_with(
+            f"http://{LOCAL_GATEWAY}:{API_PORT}/api/v0/cat",
+            params={"arg": "cat_cid"},
+            stream=True,
+            timeout=10,
+        )
+
+    @patch("requests.Session.post")
+    def test_getFromCID_understated_size_mock(self, mock_post):
+        self.client.clear_cache()
+        response = mock_post.return_value.__enter__.return_value
+        response.status_code = 200
+        response.headers = {"X-Content-Length": "4"}
+        response.iter_content.return_value = [b"hello ", b"world!"]
+
+        self.assertEqual(self.client.getFromCID("sized_cid"), b"hello world!")
+
+    @patch("requests.Session.post")
+    def test_getFromCID_truncated_stream_mock(self, mock_post):
+        self.client.clear_cache()
+        response = mock_post.return_value.__enter__.return_value
+        response.status_code = 200
+        response.headers = {"X-Content-Length": "12"}
+        response.iter_content.return_value = [b"hello "]
+
+        with self.assertRaises(EOFError):
+            self.client.getFromCID("truncated_cid")
+
+        # The partial content was not cached, so the next call fetches again
+        response.iter_content.return_value = [b"hello ", b"world!"]
+        self.assertEqual(self.client.getFromCID("truncated_cid"), b"hello world!")
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("fsspec.filesystem")
+    @patch("requests.Session.post")
+    def test_getFromCID_node_timeout_falls_back_mock(self, mock_post, mock_filesystem):
+        self.client.clear_cache()
+        # The node accepted the connection but took too long to find the content
+        mock_post.side_effect = requests.exceptions.ReadTimeout()
+        mock_filesystem.return_value.open.return_value.__enter__.return_value = BytesIO(
+            b"from gateway"
+        )
+
+        self.assertEqual(self.client.getFromCID("slow_cid"), b"from gateway")
+        mock_filesystem.return_value.open.assert_called_once_with(
+            "ipfs://slow_cid", "rb"
+        )
+
+    @patch("fsspec.filesystem")
+    @patch("requests.Session.post")
+    def test_getFromCID_node_error_falls_back_mock(self, mock_post, mock_filesystem):
+        self.client.clear_cache()
+        # Kubo answers cat with a 500 for directory CIDs
+        mock_post.return_value.__enter__.return_value.status_code = 500
+        mock_filesystem.return_value.open.return_value.__enter__.return_value = BytesIO(
+            b"from gateway"
+        )
+
+        self.assertEqual(self.client.getFromCID("dir_cid"), b"from gateway")
+        mock_filesystem.return_value.open.assert_called_once_with(
+            "ipfs://dir_cid", "rb"
+        )
+
+    @patch("ipfs_stac.client.CID_CACHE_SIZE_LIMIT", 10)
+    @patch("ipfs_stac.client.fetchCID")
+    def test_getFromCID_cache_byte_limit(self, mock_fetchCID):
+        self.client.clear_cache()
+        mock_fetchCID.side_effect = lambda cid, *args: cid.encode()
+
+        for cid in ["cid1", "cid2", "cid3", "cid3"]:
+            self.client.getFromCID(cid)
+        self.assertEqual(mock_fetchCID.call_count, 3)
+
+        # The oldest entry was evicted to stay within the byte budget
+        self.client.getFromCID("cid1")
+        self.assertEqual(mock_fetchCID.call_count, 4)
+
+    @patch("ipfs_stac.client._gather_cids", new_callable=AsyncMock)
+    def test_getFromCIDs(self, mock_gather):
+        self.client.clear_cache()
+        mock_gather.return_value = [b"data1", b"data2"]
+
+        data = self.client.getFromCIDs(["cid1", "cid2", "cid1"])
+
+        self.assertEqual(data, {"cid1": b"data1", "cid2": b"data2"})
+        mock_gather.assert_awaited_once_with(
+            f"http://{LOCAL_GATEWAY}:{GATEWAY_PORT}",
+            ["cid1", "cid2"],
+            max_concurrency=16,
+            api_url=f"http://{LOCAL_GATEWAY}:{API_PORT}",
+        )
+
+        # Cached content is served without another request
+        self.assertEqual(self.client.getFromCID("cid1"), b"data1")
+        mock_gather.return_value = [FileNotFoundError("cid3")]
+        with self.assertRaises(FileNotFoundError):
+            self.client.getFromCIDs(["cid1", "cid3"])
+        mock_gather.assert_awaited_with(
+            f"http://{LOCAL_GATEWAY}:{GATEWAY_PORT}",
+            ["cid3"],
+            max_concurrency=16,
+            api_url=f"http://{LOCAL_GATEWAY}:{API_PORT}",
+        )
+
+    @patch("ipfs_stac.client._gather_cids", new_callable=AsyncMock)
+    def test_getFromCIDs_mixed_results(self, mock_gather):
+        self.client.clear_cache()
+        mock_gather.return_value = [b"data1", FileNotFoundError("cid2"), b"data3"]
+
+        # One failed CID fails the call, no partial dict is returned
+        with self.assertRaises(FileNotFoundError):
+            self.client.getFromCIDs(["cid1", "cid2", "cid3"])
+
+        # The CIDs that succeeded were cached and are served without a request
+        self.assertEqual(
+            self.client.getFromCIDs(["cid1", "cid3"]),
+            {"cid1": b"data1", "cid3": b"data3"},
+        )
+        mock_gather.assert_awaited_once()
+
+    @patch("ipfs_stac.client.fetchCID")
+    def test_getFromCID_disk_cache(self, mock_fetchCID):
+        mock_fetchCID.return_value = b"cached data"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            client = Web3(
+                local_gateway=LOCAL_GATEWAY,
+                stac_endpoint=STAC_ENDPOINT,
+                cache_dir=cache_dir,
+            )
+            client.clear_cache()
+            self.assertEqual(client.getFromCID("disk_cid"), b"cached data")
+
+            # Content survives the in-memory cache being dropped
+            client.clear_cache()
+            self.assertEqual(client.getFromCID("disk_cid"), b"cached data")
+            mock_fetchCID.assert_called_once_with(
+                "disk_cid", client._session, LOCAL_GATEWAY, API_PORT, CHUNK_SIZE
+            )
+
+            # The disk cache belongs to that client and its assets only
+            asset = client.getAssetFromItem(
+                Item.from_dict(
+                    {
+                        "stac_version": "1.0.0",
+                        "type": "Feature",
+                        "id": "item",
+                        "bbox": [],
+                        "geometry": {},
+                        "properties": {"datetime": "2021-01-01T00:00:00Z"},
+                        "links": [],
+                        "assets": {
+                            "red": {
+                                "href": "/path/to/red",
+                                "alternate": {"IPFS": {"href": "/path/to/disk_cid"}},
+                            }
+                        },
+                    }
+                ),
+                "red",
+            )
+            self.assertIs(asset._disk_cache, client._disk_cache)
+            self.assertIsNone(self.client._disk_cache)
+
+            client.clear_cache(include_disk=True)
+            self.assertEqual(list(Path(cache_dir).iterdir()), [])
+
+    @patch("ipfs_stac.client.fetchCID")
+    def test_fetchAssets(self, mock_fetchCID):
+        self.client.clear_cache()
+        mock_fetchCID.side_effect = lambda cid, *args: f"data-{cid}".encode()
+        assets = [
+            Asset(cid, LOCAL_GATEWAY, API_PORT) for cid in ["cid1", "cid2", "cid3"]
+        ]
+
+        self.client.fetchAssets(assets, max_workers=2)
+
+        self.assertEqual(mock_fetchCID.call_count, 3)
+        self.assertEqual(
+            [asset.data for asset in assets], [b"data-cid1", b"data-cid2", b"data-cid3"]
+        )
+
     @patch("fsspec.open")
     def test_writeCID(self, mock_fsspec_open):  # TODO remove mocks?
         # Your client class instantiation here
@@ -183,9 +550,10 @@ class TestWeb3(SetUp):
         contents = b"file contents"
 
         # Mock the fsspec open method
-        mock_fsspec_open.return_value.__enter__.return_value.read.return_value = (
-            contents
-        )
+        mock_fsspec_open.return_value.__enter__.return_value.read.side_effect = [
+            contents,
+            b"",
+        ]
 
         with patch("builtins.open", mock_file):
             # Call the function
@@ -221,6 +589,30 @@ class TestWeb3(SetUp):
         data_str = data.decode("utf-8")
         self.assertEqual(data_str, "Hello World!")
 
+    @patch("requests.Session.post")
+    def test_uploadToIPFS_streams_file_mock(self, mock_post):
+        bodies = []
+
+        def post(url, data, headers, timeout):
+            # The file is only open for the duration of the request
+            bodies.append(data.to_string())
+            self.assertEqual(headers["Content-Type"], data.content_type)
+            return mock_post.return_value
+
+        mock_post.side_effect = post
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.content = orjson.dumps(
+            {"Name": "image.png", "Hash": self.IMAGE_FILE_CID}
+        )
+        image_path = Path(self.TEXT_FILE_PATH.parent, "image.png")
+
+        cid = self.client.uploadToIPFS(content=image_path)
+
+        self.assertEqual(cid, self.IMAGE_FILE_CID)
+        with Path.open(image_path, "rb") as f:
+            self.assertIn(f.read(), bodies[0])
+        self.assertIn(b'filename="image.png"', bodies[0])
+
     def test_uploadedCID_correct(self):
         cid = self.client.uploadToIPFS(content=self.TEXT_FILE_PATH)
         self.assertEqual(cid, self.TEXT_FILE_CID)
@@ -235,31 +627,177 @@ class TestWeb3(SetUp):
         assert pinned_list is not None
         self.assertIn(self.TEXT_FILE_CID, pinned_list)
 
-    @patch("psutil.process_iter")
-    @patch("subprocess.Popen")
-    @patch("requests.post")
-    def test_startDaemon(self, mock_post, mock_popen, mock_process_iter):
-        # Mock process_iter to simulate no running process
-        mock_process_iter.return_value = []
+    @patch("requests.Session.post")
+    def test_pinned_list_mock(self, mock_post):
         mock_post.return_value.status_code = 200
+        mock_post.return_value.content = orjson.dumps(
+            {"Keys": {"cid1": {"Type": "recursive"}, "cid2": {"Type": "recursive"}}}
+        )
 
-        self.client.startDaemon()
+        self.assertEqual(self.client.pinned_list(), ["cid1", "cid2"])
+
+    @patch("requests.Session.get")
+    def test_getCSVDataframeFromCID_direct_mock(self, mock_get):
+        with patch.object(
+            self.client, "getFromCID", return_value=b"a,b\n1,2021-01-01\n3,2021-01-02\n"
+        ):
+            df = self.client.getCSVDataframeFromCID("csv_cid")
+
+        self.assertEqual(list(df.columns), ["a", "b"])
+        self.assertEqual(df.shape, (2, 2))
+        # The default engine doesn't change with the installed packages
+        self.assertEqual(df["b"][0], "2021-01-01")
+        # CSV content is parsed without following a directory listing
+        mock_get.assert_not_called()
+
+    @patch("requests.Session.get")
+    @patch("fsspec.filesystem")
+    @patch("requests.Session.post")
+    def test_getCSVDataframeFromCID_directory_mock(
+        self, mock_post, mock_filesystem, mock_get
+    ):
+        self.client.clear_cache()
+        # The node can't cat a directory, so the listing comes from the gateway
+        mock_post.return_value.__enter__.return_value.status_code = 500
+        listing = b"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8" /><title>/ipfs/dir_cid/</title></head>
+<body>
+  <div id="header">
+    <a href="https://ipfs.tech" target="_blank" rel="noopener noreferrer">IPFS</a>
+  </div>
+  <div id="content">
+    <div class="type-icon">Index of <a href="/ipfs/dir_cid">dir_cid</a></div>
+    <table>
+      <tr>
+        <td><a href="/ipfs/dir_cid/data.csv">data.csv</a></td>
+        <td><a class="ipfs-hash" href="/ipfs/csv_cid?filename=data.csv">csv_cid</a></td>
+        <td>23 B</td>
+      </tr>
+    </table>
+  </div>
+</body>
+</html>
+"""
+        mock_filesystem.return_value.open.return_value.__enter__.return_value = BytesIO(
+            listing
+        )
+        mock_get.return_value.__enter__.return_value.raw = BytesIO(b"a,b\n1,2\n3,4\n")
+
+        df = self.client.getCSVDataframeFromCID("dir_cid")
 
-        mock_popen.assert_called_once_with(["ipfs", "daemon"])
+        self.assertEqual(list(df.columns), ["a", "b"])
+        self.assertEqual(df.shape, (2, 2))
+        mock_filesystem.return_value.open.assert_called_once_with(
+            "ipfs://dir_cid", "rb"
+        )
+        mock_get.assert_called_once_with(
+            "https://ipfs.io/ipfs/csv_cid?filename=data.csv", stream=True, timeout=10
+        )
+
+    def test_overwrite_config(self):
+        with tempfile.TemporaryDirectory() as config_dir:
+            config_path = Path(config_dir, "config")
+
+            # Nothing is written until a configuration is loaded
+            self.client.config = None
+            self.client.overwrite_config(config_path)
+            self.assertFalse(config_path.exists())
+
+            self.client.config = {"Addresses": {"API": "/ip4/127.0.0.1/tcp/5001"}}
+            self.client.overwrite_config(config_path)
+            self.assertEqual(orjson.loads(config_path.read_bytes()), self.client.config)
+            self.assertEqual(list(Path(config_dir).iterdir()), [config_path])
+
+    def test_close(self):
+        with patch.object(self.client._session, "close") as mock_close:
+            self.client.close()
+            mock_close.assert_called_once()
+
+    def test_session_fails_fast_on_refused_connection(self):
+        # Nothing listens on port 9, so the connection is refused
+        session = self.client._session
+        start = time.monotonic()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            session.post("http://127.0.0.1:9/api/v0/id", timeout=(0.5, 10))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    @patch("requests.Session.post")
+    def test_pin_many(self, mock_post):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.content = orjson.dumps({"Pins": ["cid1", "cid2"]})
+
+        pinned = self.client.pin_many(["cid1", "cid2"])
+
+        self.assertEqual(pinned, ["cid1", "cid2"])
+        mock_post.assert_called_once_with(
+            f"http://{self.client.local_gateway}:{self.client.api_port}/api/v0/pin/add",
+            params=[("arg", "cid1"), ("arg", "cid2")],
+            timeout=10,
+        )
+
+    @patch("requests.Session.post")
+    def test_pinAssets(self, mock_post):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.content = orjson.dumps({"Pins": ["cid1", "cid2"]})
+        assets = [Asset(cid, LOCAL_GATEWAY, API_PORT) for cid in ["cid1", "cid2"]]
+
+        self.client.pinAssets(assets)
+
+        mock_post.assert_called_once()
+        self.assertTrue(all(asset.is_pinned for asset in assets))
+
+    @patch("requests.Session.post")
+    @patch("ipfs_stac.client.Web3.pinned_list")
+    def test_pinset_mock(self, mock_pinned_list, mock_post):
+        mock_pinned_list.return_value = ["cid1", "cid2"]
+        self.client._pinset_cache = None
+        # cid3 is only pinned indirectly, through a recursively pinned parent
+        mock_post.return_value.content = orjson.dumps(
+            {"Keys": {"cid3": {"Type": "indirect"}}}
+        )
+
+        assets = [
+            Asset(cid, LOCAL_GATEWAY, API_PORT, pinset=self.client.pinset)
+            for cid in ["cid1", "cid2", "cid3"]
+        ]
+        pinned = [asset._is_pinned_to_local_node() for asset in assets]
+
+        self.assertEqual(pinned, [True, True, True])
+        mock_pinned_list.assert_called_once()
+        # Only the CID missing from the pinset is checked with the node
         mock_post.assert_called_once_with(
+            f"http://{LOCAL_GATEWAY}:{API_PORT}/api/v0/pin/ls?arg=/ipfs/cid3",
+            timeout=10,
+        )
+
+        self.client.pinset(ttl=0)
+        self.assertEqual(mock_pinned_list.call_count, 2)
+
+    @patch("subprocess.Popen")
+    @patch("requests.Session.post")
+    def test_startDaemon(self, mock_post, mock_popen):
+        # The first probe is refused since no daemon is running yet
+        mock_post.side_effect = [
+            requests.exceptions.ConnectionError,
+            MagicMock(status_code=200),
+        ]
+
+        self.client.startDaemon()
+
+        mock_popen.assert_called_once_with(
+            ["ipfs", "daemon"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        mock_post.assert_called_with(
             f"http://{self.client.local_gateway}:{self.client.api_port}/api/v0/id",
             timeout=10,
         )
 
     @patch("subprocess.Popen")
-    @patch("requests.post")
-    @patch("psutil.process_iter")
+    @patch("requests.Session.post")
     @patch("atexit.register")
-    def test_startDaemon_already_running(
-        self, mock_atexit, mock_process_iter, mock_post, mock_popen
-    ):
+    def test_startDaemon_already_running(self, mock_atexit, mock_post, mock_popen):
         # Simulate IPFS daemon already running
-        mock_process_iter.return_value = [MagicMock(info={"name": "ipfs"})]
         mock_post.return_value.status_code = 200
 
         self.client.startDaemon()
@@ -267,66 +805,68 @@ class TestWeb3(SetUp):
         mock_popen.assert_not_called()
         mock_post.assert_called_once_with(
             f"http://{self.client.local_gateway}:{self.client.api_port}/api/v0/id",
-            timeout=10,
+            timeout=(0.5, 10),
         )
         mock_atexit.assert_not_called()
 
     @patch("subprocess.Popen")
-    @patch("requests.post")
-    @patch("psutil.process_iter")
+    @patch("requests.Session.post")
     @patch("atexit.register")
-    def test_startDaemon_not_running(
-        self, mock_atexit, mock_process_iter, mock_post, mock_popen
-    ):
+    def test_startDaemon_not_running(self, mock_atexit, mock_post, mock_popen):
         # Simulate IPFS daemon not running
-        mock_process_iter.return_value = []
-        mock_post.return_value.status_code = 200
+        mock_post.side_effect = [
+            requests.exceptions.ConnectionError,
+            MagicMock(status_code=200),
+        ]
 
         self.client.startDaemon()
 
-        mock_popen.assert_called_once_with(["ipfs", "daemon"])
-        mock_post.assert_called_once_with(
-            f"http://{self.client.local_gateway}:{self.client.api_port}/api/v0/id",
-            timeout=10,
+        mock_popen.assert_called_once_with(
+            ["ipfs", "daemon"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
         )
+        self.assertEqual(mock_post.call_count, 2)
         mock_atexit.assert_called_once()
 
+    @patch("time.sleep")
     @patch("subprocess.Popen")
-    @patch("requests.post")
-    @patch("psutil.process_iter")
+    @patch("requests.Session.post")
     @patch("atexit.register")
     def test_startDaemon_fail_to_start(
-        self, mock_atexit, mock_process_iter, mock_post, mock_popen
+        self, mock_atexit, mock_post, mock_popen, mock_sleep
     ):
         # Simulate IPFS daemon not running and failing to start
-        mock_process_iter.return_value = []
         mock_post.side_effect = requests.exceptions.ConnectionError
 
         with self.assertRaises(Exception) as context:
             self.client.startDaemon()
 
         self.assertTrue("Failed to start IPFS daemon" in str(context.exception))
-        mock_popen.assert_called_once_with(["ipfs", "daemon"])
+        # The API is probed with backoff before giving up
+        self.assertEqual(mock_sleep.call_count, 6)
+        mock_popen.assert_called_once_with(
+            ["ipfs", "daemon"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
         mock_atexit.assert_called_once()
 
     @patch("subprocess.Popen")
-    @patch("requests.post")
-    @patch("psutil.process_iter")
+    @patch("requests.Session.post")
     @patch("atexit.register")
-    def test_startDaemon_shutdown_process(
-        self, mock_atexit, mock_process_iter, mock_post, mock_popen
-    ):
+    def test_startDaemon_shutdown_process(self, mock_atexit, mock_post, mock_popen):
         # Simulate IPFS daemon not running
-        mock_process_iter.return_value = []
-        mock_post.return_value.status_code = 200
+        mock_post.side_effect = [
+            requests.exceptions.ConnectionError,
+            MagicMock(status_code=200),
+        ]
 
         mock_process = MagicMock()
         mock_popen.return_value = mock_process
 
         self.client.startDaemon()
 
-        mock_popen.assert_called_once_with(["ipfs", "daemon"])
-        mock_post.assert_called_once_with(
+        mock_popen.assert_called_once_with(
+            ["ipfs", "daemon"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        mock_post.assert_called_with(
             f"http://{self.client.local_gateway}:{self.client.api_port}/api/v0/id",
             timeout=10,
         )
@@ -339,12 +879,13 @@ class TestWeb3(SetUp):
         self.client.shutdown_process()
         self.assertIsNone(self.client.daemon_status)
 
-    @patch("psutil.process_iter")
     @patch("subprocess.Popen")
-    @patch("requests.post")
-    def test_shutdown_process(self, mock_post, mock_popen, mock_process_iter):
-        mock_process_iter.return_value = []
-        mock_post.return_value.status_code = 200
+    @patch("requests.Session.post")
+    def test_shutdown_process(self, mock_post, mock_popen):
+        mock_post.side_effect = [
+            requests.exceptions.ConnectionError,
+            MagicMock(status_code=200),
+        ]
 
         self.client.startDaemon()
 
@@ -353,25 +894,22 @@ class TestWeb3(SetUp):
             mock_terminate.assert_called_once()
             self.assertIsNone(self.client.daemon_status)
 
-    @patch("psutil.process_iter")
     @patch("subprocess.Popen")
-    def test_shutdown_process_none(self, mock_subprocess, mock_psutil):
+    def test_shutdown_process_none(self, mock_subprocess):
         self.client.startDaemon()
         self.client.shutdown_process()
         self.assertIsNone(self.client.daemon_status)
 
-    @patch("psutil.process_iter")
     @patch("subprocess.Popen")
-    def test_shutdown_process_active(self, mock_subprocess, mock_psutil):
+    def test_shutdown_process_active(self, mock_subprocess):
         mock_process = MagicMock()
         self.client.daemon_status = mock_process
         self.client.shutdown_process()
         mock_process.terminate.assert_called_once()
         self.assertIsNone(self.client.daemon_status)
 
-    @patch("psutil.process_iter")
     @patch("subprocess.Popen")
-    def test_shutdown_process_exception(self, mock_subprocess, mock_psutil):
+    def test_shutdown_process_exception(self, mock_subprocess):
         mock_process = MagicMock()
         mock_process.terminate.side_effect = Exception("Terminate failed")
         self.client.daemon_status = mock_process
@@ -440,3 +978,148 @@ class TestAsset(SetUp):
         np_array = self.image_asset.to_np_ndarray()
         self.assertIsInstance(np_array, np.ndarray)
         self.assertEqual(np_array.shape, (50, 50))
+
+    def test_to_np_ndarray_window(self):
+        np_array = self.image_asset.to_np_ndarray(window=Window(0, 0, 10, 20))
+        self.assertEqual(np_array.shape, (20, 10))
+
+        np_array = self.image_asset.to_np_ndarray(out_shape=(25, 25))
+        self.assertEqual(np_array.shape, (25, 25))
+
+    def test_to_np_ndarray_bands(self):
+        np_array = self.image_asset.to_np_ndarray(bands=[1])
+        self.assertEqual(np_array.shape, (1, 50, 50))
+
+    def test_to_np_ndarray_out(self):
+        out = np.empty((50, 50), dtype=np.uint16)
+        np_array = self.image_asset.to_np_ndarray(out=out)
+        self.assertIs(np_array, out)
+
+    @patch("rasterio.Env")
+    @patch("rasterio.open")
+    def test_to_np_ndarray_remote_window_mock(self, mock_open, mock_env):
+        asset = Asset("remote_cid", LOCAL_GATEWAY, API_PORT, gateway_port=GATEWAY_PORT)
+        dataset = mock_open.return_value.__enter__.return_value
+        dataset.read.return_value = np.zeros((20, 10), dtype=np.float32)
+
+        np_array = asset.to_float32(window=Window(0, 0, 10, 20))
+
+        self.assertEqual(np_array.shape, (20, 10))
+        self.assertIsNone(asset.data)
+        mock_open.assert_called_once_with(
+            f"/vsicurl/http://{LOCAL_GATEWAY}:{GATEWAY_PORT}/ipfs/remote_cid"
+        )
+        # GDAL's HTTP requests are bounded like the requests session
+        env_options = mock_env.call_args.kwargs
+        self.assertEqual(env_options["GDAL_HTTP_TIMEOUT"], "10")
+        self.assertEqual(env_options["GDAL_HTTP_MAX_RETRY"], "3")
+
+    def test_to_float32(self):
+        np_array = self.image_asset.to_float32()
+        self.assertEqual(np_array.dtype, np.float32)
+        self.assertEqual(np_array.shape, (50, 50))
+
+
+# Unit tests for the module helpers; they need neither a node nor the network
+class TestHelpers(TestCase):
+    def test_disk_cache_entry_removed_during_get(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            disk_cache = _DiskCache(cache_dir)
+            disk_cache.set("cid", b"data")
+            # Another thread evicts the entry between the read and the mtime refresh
+            with patch("os.utime", side_effect=FileNotFoundError):
+                self.assertEqual(disk_cache.get("cid"), b"data")
+
+    def test_disk_cache_leaves_other_files(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            Path(cache_dir, "notes.txt").write_bytes(b"keep me")
+            Path(cache_dir, "subdir").mkdir()
+            disk_cache = _DiskCache(cache_dir, size_limit=0)
+
+            # Eviction and clearing only touch cache entries
+            disk_cache.set("cid", b"data")
+            self.assertIsNone(disk_cache.get("cid"))
+            disk_cache.clear()
+            self.assertEqual(
+                sorted(path.name for path in Path(cache_dir).iterdir()),
+                ["notes.txt", "subdir"],
+            )
+
+    def test_disk_cache_write_failure_warns(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            disk_cache = _DiskCache(cache_dir)
+            with patch(
+                "ipfs_stac.client._write_atomic", side_effect=OSError("disk full")
+            ):
+                with self.assertWarns(UserWarning):
+                    disk_cache.set("cid", b"data")
+            self.assertIsNone(disk_cache.get("cid"))
+
+    def test_copy_pipelined_multiple_chunks(self):
+        contents = bytes(range(256)) * 40
+        dst = BytesIO()
+
+        _copy_pipelined(BytesIO(contents), dst, length=1000, depth=2)
+
+        self.assertEqual(dst.getvalue(), contents)
+
+    def test_copy_pipelined_reader_error(self):
+        src = Mock()
+        src.read.side_effect = [b"first", OSError("gateway went away")]
+        dst = BytesIO()
+
+        with self.assertRaises(OSError):
+            _copy_pipelined(src, dst, length=5)
+        self.assertEqual(dst.getvalue(), b"first")
+
+    def test_copy_pipelined_writer_error_stops_reader(self):
+        # An endless source: only the stop signal can end the reader thread
+        src = Mock()
+        src.read.return_value = b"chunk"
+        dst = Mock()
+        dst.write.side_effect = OSError("disk full")
+        threads_before = threading.active_count()
+
+        with self.assertRaises(OSError):
+            _copy_pipelined(src, dst, length=5, depth=2)
+
+        self.assertEqual(threading.active_count(), threads_before)
+        reads = src.read.call_count
+        time.sleep(0.05)
+        self.assertEqual(src.read.call_count, reads)
+
+    def test_gather_cids_falls_back_to_gateway(self):
+        from aiohttp import web
+        from aiohttp.test_utils import TestServer
+
+        async def cat(request):
+            # Kubo can't cat directories; "short_cid" announces more than it sends
+            if request.query["arg"] in ("dir_cid", "missing_cid"):
+                return web.Response(status=500)
+            if request.query["arg"] == "short_cid":
+                return web.Response(body=b"from", headers={"X-Content-Length": "9"})
+            return web.Response(body=b"from node")
+
+        async def gateway(request):
+            if request.match_info["cid"] == "missing_cid":
+                return web.Response(status=404)
+            return web.Response(body=f"gateway {request.match_info['cid']}".encode())
+
+        async def fetch():
+            app = web.Application()
+            app.router.add_post("/api/v0/cat", cat)
+            app.router.add_get("/ipfs/{cid}", gateway)
+            async with TestServer(app) as server:
+                url = str(server.make_url("")).rstrip("/")
+                return await _gather_cids(
+                    url,
+                    ["file_cid", "dir_cid", "short_cid", "missing_cid"],
+                    api_url=url,
+                )
+
+        results = asyncio.run(fetch())
+
+        self.assertEqual(
+            results[:3], [b"from node", b"gateway dir_cid", b"gateway short_cid"]
+        )
+        self.assertIsInstance(results[3], FileNotFoundError)
@@ -51,18 +51,21 @@ class TestIntegration(SetUp):
         red_band_ndarray = red_band_asset.to_np_ndarray()
         assert isinstance(red_band_ndarray, np.ndarray)
         assert red_band_ndarray.shape == (8031, 7931)
-        assert red_band_ndarray.dtype == np.float32
+        assert red_band_ndarray.dtype == np.uint16
         assert red_band_ndarray[0, 0] == 0
 
+        red_band_float32 = red_band_asset.to_float32()
+        assert red_band_float32.dtype == np.float32
+
     def test_asset_ndvi_calc(self) -> None:
         collection_list = ["landsat-c2l1"]
         item = self.client.searchSTACByBox(self.bbox, collection_list)[0]
         nir_band_asset = self.client.getAssetFromItem(item, "nir08", True)
         assert nir_band_asset is not None
-        nir_band_np = nir_band_asset.to_np_ndarray()
+        nir_band_np = nir_band_asset.to_float32()
         red_band_asset = self.client.getAssetFromItem(item, "red", True)
         assert red_band_asset is not None
-        red_band_np = red_band_asset.to_np_ndarray()
+        red_band_np = red_band_asset.to_float32()
 
         eps = 0.0001  # Avoid divide by zero errors
         ndvi = (nir_band_np - red_band_np) / (nir_band_np + red_band_np + eps)